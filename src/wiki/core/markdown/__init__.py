@@ -8,10 +8,12 @@ class ArticleMarkdown(markdown.Markdown):
     def __init__(self, article, preview=False, user=None, *args, **kwargs):
         kwargs.update(settings.MARKDOWN_KWARGS)
         kwargs["extensions"] = self.get_markdown_extensions()
-        super().__init__(*args, **kwargs)
+        # Set before super().__init__() so extensions can inspect them
+        # while they are registered.
         self.article = article
         self.preview = preview
         self.user = user
+        super().__init__(*args, **kwargs)
 
     def core_extensions(self):
         """List of core extensions found in the mdx folder"""
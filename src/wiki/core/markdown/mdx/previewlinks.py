@@ -7,18 +7,22 @@ class PreviewLinksExtension(markdown.Extension):
     """Markdown Extension that sets all anchor targets to _blank when in preview mode"""
 
     def extendMarkdown(self, md):
-
-        md.treeprocessors._sort()
-        priority = md.treeprocessors._priority[-1].priority - 5
+        # Only preview renders need the processor, skip it for regular renders
+        if not getattr(md, "preview", False):
+            return
+        # Run after all other treeprocessors. Taking the minimum avoids
+        # re-sorting the registry every time an extension is attached.
+        priority = min(item.priority for item in md.treeprocessors._priority) - 5
         md.treeprocessors.register(PreviewLinksTree(md), "previewlinks", priority)
 
 
 class PreviewLinksTree(Treeprocessor):
     def run(self, root):
         if self.md.preview:
-            for a in root.findall(".//a"):
+            for a in root.iter("a"):
+                href = a.get("href")
                 # Do not set target for links like href='#markdown'
-                if not a.get("href").startswith("#"):
+                if href is not None and not href.startswith("#"):
                     a.set("target", "_blank")
         return root
 
@@ -2,8 +2,10 @@ from unittest.mock import patch
 
 import markdown
 from django.test import TestCase
+from markdown.util import etree
 from wiki.core.markdown import ArticleMarkdown
 from wiki.core.markdown.mdx.codehilite import WikiCodeHiliteExtension
+from wiki.core.markdown.mdx.previewlinks import PreviewLinksTree
 from wiki.core.markdown.mdx.responsivetable import ResponsiveTableExtension
 from wiki.models import URLPath
 
@@ -26,6 +28,12 @@ class ArticleMarkdownTests(ArticleTestBase):
         ArticleMarkdown(None)
         self.assertEqual(len(extensions), number_of_extensions)
 
+    def test_previewlinks_only_registered_for_preview(self):
+        self.assertNotIn("previewlinks", ArticleMarkdown(None).treeprocessors)
+        self.assertIn(
+            "previewlinks", ArticleMarkdown(None, preview=True).treeprocessors
+        )
+
     def test_html_removal(self):
 
         urlpath = URLPath.create_urlpath(
@@ -51,6 +59,23 @@ class ResponsiveTableExtensionTests(TestCase):
         self.assertEqual(self.md.convert(text), expected)
 
 
+class PreviewLinksTreeTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.md = markdown.Markdown()
+        self.md.preview = True
+
+    def test_anchor_without_href(self):
+        root = etree.Element("div")
+        anchor = etree.SubElement(root, "a")
+        external = etree.SubElement(root, "a", href="https://example.com")
+        internal = etree.SubElement(root, "a", href="#markdown")
+        PreviewLinksTree(self.md).run(root)
+        self.assertIsNone(anchor.get("target"))
+        self.assertEqual(external.get("target"), "_blank")
+        self.assertIsNone(internal.get("target"))
+
+
 class CodehiliteTests(TestCase):
     def test_fenced_code(self):
         md = markdown.Markdown(extensions=["extra", WikiCodeHiliteExtension()])
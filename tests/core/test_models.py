@@ -1,6 +1,10 @@
+import re
+from unittest.mock import patch
+
 from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
+from django.test.testcases import SimpleTestCase
 from django.test.testcases import TestCase
 from django.urls import re_path
 from wiki.conf import settings
@@ -13,6 +17,8 @@ from wiki.urls import WikiURLPatterns
 User = get_user_model()
 Group = apps.get_model(settings.GROUP_MODEL)
 
+_H1_RE = re.compile(r'<h1 id="wiki-toc-header">header.*</h1>', re.DOTALL)
+
 
 class WikiCustomUrlPatterns(WikiURLPatterns):
     def get_article_urls(self):
@@ -36,10 +42,22 @@ class WikiCustomUrlPatterns(WikiURLPatterns):
         return urlpatterns
 
 
+class ArticleManagerTest(SimpleTestCase):
+    # XXX maybe redundant test
+    def test_model_manager_class(self):
+
+        self.assertIsInstance(Article.objects, ArticleManager)
+
+
 class ArticleModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Shared by the tests that only read an article without revisions
+        cls.empty_article = Article.objects.create()
+
     def test_default_fields_of_empty_article(self):
 
-        a = Article.objects.create()
+        a = self.empty_article
 
         self.assertIsNone(a.current_revision)
         self.assertIsNone(a.owner)
@@ -53,11 +71,6 @@ class ArticleModelTest(TestCase):
         self.assertIsNotNone(a.other_read)
         self.assertIsNotNone(a.other_write)
 
-    # XXX maybe redundant test
-    def test_model_manager_class(self):
-
-        self.assertIsInstance(Article.objects, ArticleManager)
-
     def test_str_method_if_have_current_revision(self):
 
         title = "Test title"
@@ -69,21 +82,22 @@ class ArticleModelTest(TestCase):
 
     def test_str_method_if_dont_have_current_revision(self):
 
-        a = Article.objects.create()
+        a = self.empty_article
 
-        expected = "Article without content (1)"
+        expected = "Article without content ({})".format(a.pk)
 
         self.assertEqual(str(a), expected)
 
     def test_get_absolute_url_if_urlpath_set_is_exists(self):
 
+        # The path does not depend on the site, so reuse the current one
+        site = Site.objects.get_current()
+
         a1 = Article.objects.create()
-        s1 = Site.objects.create(domain="something.com", name="something.com")
-        u1 = URLPath.objects.create(article=a1, site=s1)
+        u1 = URLPath.objects.create(article=a1, site=site)
 
         a2 = Article.objects.create()
-        s2 = Site.objects.create(domain="somethingelse.com", name="somethingelse.com")
-        URLPath.objects.create(article=a2, site=s2, parent=u1, slug="test_slug")
+        URLPath.objects.create(article=a2, site=site, parent=u1, slug="test_slug")
 
         url = a2.get_absolute_url()
 
@@ -93,14 +107,30 @@ class ArticleModelTest(TestCase):
 
     def test_get_absolute_url_if_urlpath_set_is_not_exists(self):
 
-        a = Article.objects.create()
+        a = self.empty_article
 
         url = a.get_absolute_url()
 
-        expected = "/1/"
+        expected = "/{}/".format(a.pk)
 
         self.assertEqual(url, expected)
 
+    def test_get_absolute_url_follows_renamed_ancestor(self):
+
+        site = Site.objects.get_current()
+        root = URLPath.objects.create(article=Article.objects.create(), site=site)
+        parent = URLPath.objects.create(
+            article=Article.objects.create(), site=site, parent=root, slug="c"
+        )
+        a = Article.objects.create()
+        URLPath.objects.create(article=a, site=site, parent=parent, slug="g")
+        self.assertEqual(a.get_absolute_url(), "/c/g/")
+
+        parent.slug = "again"
+        parent.save()
+
+        self.assertEqual(a.get_absolute_url(), "/again/g/")
+
     def test_article_is_related_to_articlerevision(self):
 
         title = "Test title"
@@ -111,6 +141,24 @@ class ArticleModelTest(TestCase):
         self.assertEqual(r.article, a)
         self.assertIn(r, a.articlerevision_set.all())
 
+    def test_articlerevision_relation_addrevision(self):
+
+        a = Article.objects.create()
+        r1 = ArticleRevision(title="Revision 1")
+        a.add_revision(r1)
+        r2 = ArticleRevision(title="Revision 2")
+        a.add_revision(r2)
+        r3 = ArticleRevision(title="Revision 3")
+        a.add_revision(r3)
+
+        self.assertEqual(
+            [r1.revision_number, r2.revision_number, r3.revision_number], [1, 2, 3]
+        )
+        self.assertIsNone(r1.previous_revision)
+        self.assertEqual(r2.previous_revision, r1)
+        self.assertEqual(r3.previous_revision, r2)
+        self.assertEqual(Article.objects.get(pk=a.pk).current_revision, r3)
+
     def test_article_is_related_to_owner(self):
 
         u = User.objects.create(username="Noman", password="pass")
@@ -130,8 +178,9 @@ class ArticleModelTest(TestCase):
     def test_cache(self):
         a = Article.objects.create()
         ArticleRevision.objects.create(article=a, title="test", content="# header")
-        expected = """<h1 id="wiki-toc-header">header""" """.*</h1>"""
         # cached content does not exist yet. this will create it
-        self.assertRegexpMatches(a.get_cached_content(), expected)
-        # actual cached content test
-        self.assertRegexpMatches(a.get_cached_content(), expected)
+        self.assertRegex(a.get_cached_content(), _H1_RE)
+        # actual cached content test, must not render the article again
+        with patch.object(a, "render") as render:
+            self.assertRegex(a.get_cached_content(), _H1_RE)
+        render.assert_not_called()